@@ -1,94 +1,134 @@
-import os
+import re
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
+from config import RestaurantInfo, get_restaurant, get_settings, get_system_prompt
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Load environment variables
 load_dotenv()
 
+# Intents that always hand the call over to human staff
+ESCALATION_INTENTS = frozenset({"order_request", "reservation_request", "complaint", "contact_staff"})
+
+# Keywords that identify each caller intent, in priority order
+INTENT_KEYWORDS = {
+    "greeting": ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"],
+    "hours_inquiry": ["open", "close", "hours", "time", "when", "what time", "what are your hours"],
+    "location_inquiry": ["where", "address", "location", "find", "direction", "located"],
+    "menu_inquiry": ["menu", "food", "what do you", "what's on", "offer", "have"],
+    "order_request": ["order", "place", "buy", "get", "delivery", "takeout", "take out"],
+    "reservation_request": ["reservation", "book", "table", "seat", "reserve"],
+    "complaint": ["problem", "issue", "wrong", "not", "complaint", "angry", "upset", "terrible", "bad"],
+    "delivery_inquiry": ["delivery", "takeout", "take out", "pickup", "pick up", "carryout"],
+    "closing": ["bye", "goodbye", "thanks", "thank you", "that's all", "see you", "later"],
+    "contact_staff": ["speak", "talk", "manager", "human", "staff", "person", "someone"]
+}
+
+def _build_keyword_intents() -> Dict[str, tuple]:
+    """
+    Invert INTENT_KEYWORDS so each keyword maps to every intent it signals
+    """
+    keyword_intents = {}
+    for intent, keywords in INTENT_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_intents.setdefault(keyword, []).append(intent)
+    return {keyword: tuple(intents) for keyword, intents in keyword_intents.items()}
+
+# A keyword can belong to several intents (e.g. "delivery"), so it maps to all of them
+KEYWORD_INTENTS = _build_keyword_intents()
+
 class RestaurantAIAgent:
     """
     AI agent for handling restaurant-related conversations
     """
     
-    def __init__(self):
+    def __init__(self, restaurant_info: Optional[RestaurantInfo] = None):
         # Get OpenAI API key from environment
-        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.api_key = get_settings().openai_api_key
         self.openai_client = OpenAI(api_key=self.api_key) if self.api_key else None
         
         # Check if OpenAI is available
         self.has_openai = self.openai_client is not None
         
-        # Restaurant information
-        self.restaurant_info = {
-            "name": os.getenv("RESTAURANT_NAME", "Your Restaurant Name"),
-            "address": os.getenv("RESTAURANT_ADDRESS", "123 Restaurant Street, City, State 12345"),
-            "hours": os.getenv("RESTAURANT_HOURS", "Open from 10 AM to 10 PM daily"),
-            "menu_categories": os.getenv("MENU_CATEGORIES", "Appetizers, Main Courses, Desserts, Beverages").split(", "),
-            "delivery_policy": os.getenv("DELIVERY_POLICY", "We offer delivery within a 5-mile radius from 11 AM to 9 PM"),
-            "phone": os.getenv("RESTAURANT_PHONE", "Phone Number")
+        # Whether generate_response actually calls the LLM for open-ended messages. The OpenAI
+        # branch below is disabled for testing, so replies are mock responses; set this to
+        # self.has_openai when re-enabling it
+        self.generates_with_llm = False
+        
+        # Build a keyword automaton once so intent detection is a single pass over the message.
+        # Without pyahocorasick, fall back to one precompiled alternation pattern per intent.
+        self._keyword_automaton = None
+        self._intent_patterns = []
+        if ahocorasick is not None:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword, intents in KEYWORD_INTENTS.items():
+                self._keyword_automaton.add_word(keyword, intents)
+            self._keyword_automaton.make_automaton()
+        else:
+            self._intent_patterns = [
+                (intent, re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE))
+                for intent, keywords in INTENT_KEYWORDS.items()
+            ]
+        
+        # Restaurant information and system prompt, shared with the API
+        self.restaurant_info = restaurant_info if restaurant_info is not None else get_restaurant()
+        self.system_prompt = get_system_prompt()
+        
+        # The system prompt is identical for every request, so build its message once. It is always
+        # sent as the first message, ahead of the per-call history and user message, which keeps it
+        # a byte-identical prefix that OpenAI's automatic prompt caching can reuse across calls.
+        self._system_message = {"role": "system", "content": self.system_prompt}
+        
+        # Precompute the fixed responses; restaurant info does not change for the life of the process
+        name = self.restaurant_info.name
+        hours_lower = self.restaurant_info.hours.lower()
+        categories = ", ".join(self.restaurant_info.menu_categories)
+        staff_handoff = "I'd be happy to connect you with our staff who can help you with that."
+        self._responses = {
+            "greeting": f"Hello! Thank you for calling {name}. How can I assist you today?",
+            "hours_inquiry": f"We are {hours_lower}.",
+            "location_inquiry": f"We are located at {self.restaurant_info.address}.",
+            "menu_inquiry": f"We offer {categories}. For more details, please speak with our staff.",
+            "order_request": staff_handoff,
+            "reservation_request": staff_handoff,
+            "complaint": staff_handoff,
+            "delivery_inquiry": f"{self.restaurant_info.delivery_policy}.",
+            "closing": f"Thank you for calling {name}. Have a great day!",
+            "contact_staff": "I'll connect you with our staff who can better assist you."
         }
         
-        # System prompt
-        self.system_prompt = f"""
-        You are a professional restaurant call-handling assistant for {self.restaurant_info['name']}. 
-        Your primary function is to answer incoming calls, provide information about the restaurant, and assist customers while adhering to strict operational guidelines.
-
-        Important guidelines:
-        - Answer calls promptly and politely
-        - Provide only the restaurant information provided in your knowledge base
-        - Never place orders, take reservations, or access any system data
-        - If a customer wants to order, make a reservation, or has a complaint, politely transfer to human staff
-        - Keep responses short and clear (1-2 sentences when possible)
-        - If unsure about information, politely transfer to staff
-        - Always offer human handoff when appropriate
-
-        Restaurant Information:
-        - Name: {self.restaurant_info['name']}
-        - Address: {self.restaurant_info['address']}
-        - Hours: {self.restaurant_info['hours']}
-        - Menu Categories: {', '.join(self.restaurant_info['menu_categories'])}
-        - Delivery Policy: {self.restaurant_info['delivery_policy']}
-
-        Example responses:
-        - Greeting: "Hello! Thank you for calling {self.restaurant_info['name']}. How can I assist you today?"
-        - Hours: "We are open {self.restaurant_info['hours'].lower()}."
-        - Location: "We are located at {self.restaurant_info['address']}."
-        - Orders: "I'd be happy to connect you with our staff who can help you place your order."
-        - Closing: "Thank you for calling {self.restaurant_info['name']}. Have a great day!"
-
-        If a customer wants to place an order, make a reservation, or has a complaint, always transfer to human staff.
-        """
+        # Keyword-driven fallbacks for messages without a recognised intent, checked in order
+        self._mock_responses = (
+            (("open", "hour"), f"We are {hours_lower}."),
+            (("where", "address"), f"We are located at {self.restaurant_info.address}."),
+            (("menu", "food"), f"We offer {categories}."),
+            (("order", "delivery"), "I'd be happy to connect you with our staff who can help you place your order.")
+        )
+        self._mock_default_response = f"Thank you for calling {name}. We are {hours_lower}."
     
     def analyze_intent(self, user_message: str) -> Dict[str, Any]:
         """
         Analyze the intent of the user's message
         """
-        # Define possible intents
-        intent_keywords = {
-            "greeting": ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"],
-            "hours_inquiry": ["open", "close", "hours", "time", "when", "what time", "what are your hours"],
-            "location_inquiry": ["where", "address", "location", "find", "direction", "located"],
-            "menu_inquiry": ["menu", "food", "what do you", "what's on", "offer", "have"],
-            "order_request": ["order", "place", "buy", "get", "delivery", "takeout", "take out"],
-            "reservation_request": ["reservation", "book", "table", "seat", "reserve"],
-            "complaint": ["problem", "issue", "wrong", "not", "complaint", "angry", "upset", "terrible", "bad"],
-            "delivery_inquiry": ["delivery", "takeout", "take out", "pickup", "pick up", "carryout"],
-            "closing": ["bye", "goodbye", "thanks", "thank you", "that's all", "see you", "later"],
-            "contact_staff": ["speak", "talk", "manager", "human", "staff", "person", "someone"]
-        }
-        
-        # Convert message to lowercase for matching
-        message_lower = user_message.lower()
-        
-        # Find matching intents
-        detected_intents = []
-        for intent, keywords in intent_keywords.items():
-            for keyword in keywords:
-                if keyword in message_lower:
-                    if intent not in detected_intents:
-                        detected_intents.append(intent)
+        if self._keyword_automaton is not None:
+            # Convert message to lowercase for matching
+            message_lower = user_message.lower()
+            
+            # Find matching intents
+            detected = set()
+            for _, intents in self._keyword_automaton.iter(message_lower):
+                detected.update(intents)
+            
+            # Report intents in keyword-table order so the primary intent is stable
+            detected_intents = [intent for intent in INTENT_KEYWORDS if intent in detected]
+        else:
+            detected_intents = [intent for intent, pattern in self._intent_patterns if pattern.search(user_message)]
         
         # If no specific intent detected, default to general inquiry
         if not detected_intents:
@@ -98,8 +138,7 @@ class RestaurantAIAgent:
         primary_intent = detected_intents[0] if detected_intents else "general_inquiry"
         
         # Check if escalation is needed based on detected intents
-        escalation_intents = ["order_request", "reservation_request", "complaint", "contact_staff"]
-        escalation_needed = any(intent in escalation_intents for intent in detected_intents)
+        escalation_needed = not ESCALATION_INTENTS.isdisjoint(detected_intents)
         
         return {
             "primary_intent": primary_intent,
@@ -107,6 +146,12 @@ class RestaurantAIAgent:
             "escalation_needed": escalation_needed
         }
     
+    def has_fixed_response(self, primary_intent: str) -> bool:
+        """
+        Check whether an intent is answered from the precomputed responses
+        """
+        return primary_intent in self._responses
+    
     def generate_response(self, user_message: str, conversation_history: List[Dict], intent_analysis: Dict[str, Any] = None) -> str:
         """
         Generate a response to the user's message
@@ -116,31 +161,10 @@ class RestaurantAIAgent:
         
         primary_intent = intent_analysis["primary_intent"]
         
-        # Handle different intents with appropriate responses
-        if primary_intent == "greeting":
-            return f"Hello! Thank you for calling {self.restaurant_info['name']}. How can I assist you today?"
-        
-        elif primary_intent == "hours_inquiry":
-            return f"We are {self.restaurant_info['hours'].lower()}."
-        
-        elif primary_intent == "location_inquiry":
-            return f"We are located at {self.restaurant_info['address']}."
-        
-        elif primary_intent == "menu_inquiry":
-            categories = ", ".join(self.restaurant_info['menu_categories'])
-            return f"We offer {categories}. For more details, please speak with our staff."
-        
-        elif primary_intent in ["order_request", "reservation_request", "complaint"]:
-            return "I'd be happy to connect you with our staff who can help you with that."
-        
-        elif primary_intent == "delivery_inquiry":
-            return f"{self.restaurant_info['delivery_policy']}."
-        
-        elif primary_intent == "closing":
-            return f"Thank you for calling {self.restaurant_info['name']}. Have a great day!"
-        
-        elif primary_intent == "contact_staff":
-            return "I'll connect you with our staff who can better assist you."
+        # Intents with a fixed answer are served from the precomputed responses
+        canned_response = self._responses.get(primary_intent)
+        if canned_response is not None:
+            return canned_response
         
         else:
             # For testing purposes, always use mock responses to avoid API delays
@@ -150,10 +174,9 @@ class RestaurantAIAgent:
             # Original OpenAI code (commented out for testing):
             # if self.has_openai:
             #     try:
-            #         # Prepare conversation history for context
-            #         messages = [
-            #             {"role": "system", "content": self.system_prompt}
-            #         ]
+            #         # Prepare conversation history for context. The static system message
+            #         # always comes first so the provider's prompt cache can reuse it.
+            #         messages = [self._system_message]
             #         
             #         # Add conversation history
             #         for msg in conversation_history:
@@ -173,7 +196,7 @@ class RestaurantAIAgent:
             #         return response.choices[0].message.content.strip()
             #     except Exception as e:
             #         # If OpenAI fails, return a default response
-            #         return f"I'm experiencing technical difficulties. {self.restaurant_info['name']} is {self.restaurant_info['hours'].lower()}.
+            #         return f"I'm experiencing technical difficulties. {self.restaurant_info.name} is {self.restaurant_info.hours.lower()}.
             # else:
             #     # If OpenAI is not available, return a mock response
             #     return self._generate_mock_response(user_message, primary_intent)
@@ -182,17 +205,12 @@ class RestaurantAIAgent:
         """
         Generate a mock response when OpenAI is not available
         """
-        if "open" in user_message.lower() or "hour" in user_message.lower():
-            return f"We are {self.restaurant_info['hours'].lower()}."
-        elif "where" in user_message.lower() or "address" in user_message.lower():
-            return f"We are located at {self.restaurant_info['address']}."
-        elif "menu" in user_message.lower() or "food" in user_message.lower():
-            categories = ", ".join(self.restaurant_info['menu_categories'])
-            return f"We offer {categories}."
-        elif "order" in user_message.lower() or "delivery" in user_message.lower():
-            return "I'd be happy to connect you with our staff who can help you place your order."
-        else:
-            return f"Thank you for calling {self.restaurant_info['name']}. We are {self.restaurant_info['hours'].lower()}."
+        # Lowercase once, then take the first entry whose keywords appear in the message
+        message_lower = user_message.lower()
+        for keywords, response in self._mock_responses:
+            if any(keyword in message_lower for keyword in keywords):
+                return response
+        return self._mock_default_response
     
     def needs_escalation(self, user_message: str, conversation_history: List[Dict], intent_analysis: Dict[str, Any] = None) -> bool:
         """
@@ -201,7 +219,5 @@ class RestaurantAIAgent:
         if intent_analysis is None:
             intent_analysis = self.analyze_intent(user_message)
         
-        # Escalate if any of these intents are detected
-        escalation_intents = ["order_request", "reservation_request", "complaint", "contact_staff"]
-        
+        # Escalate if any of ESCALATION_INTENTS were detected
         return intent_analysis["escalation_needed"]
\ No newline at end of file
@@ -1,20 +1,24 @@
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import PlainTextResponse, Response
+from fastapi import APIRouter, FastAPI, Request, HTTPException
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response, StreamingResponse
 import asyncio
+import hashlib
+import io
 import logging
-import os
-import json
-from typing import Dict, Any
+import orjson
+import uuid
+from difflib import SequenceMatcher
+from typing import Dict, List, Any, Optional, Tuple
 import openai
-import requests
+import httpx
 from pydantic import BaseModel
 from openai import OpenAI
 import redis
-from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse
-from twilio.request_validator import RequestValidator
-from twilio_integration import twilio_handler
+import redis.asyncio
+from twilio_integration import CONFIG_STATUS_JSON, twilio_handler
 from ai_agent import RestaurantAIAgent
+from config import get_restaurant, get_settings
+from semantic_cache import SemanticCache
+from session_store import CallSession, InMemorySessionStore, RedisSessionStore
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -24,20 +28,32 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Configuration from environment variables
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
-TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
-TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+# Configuration from environment variables, parsed once
+settings = get_settings()
+OPENAI_API_KEY = settings.openai_api_key
+ELEVENLABS_API_KEY = settings.elevenlabs_api_key
+TWILIO_ACCOUNT_SID = settings.twilio_account_sid
+TWILIO_AUTH_TOKEN = settings.twilio_auth_token
+TWILIO_PHONE_NUMBER = settings.twilio_phone_number
 
 # Initialize OpenAI client
 openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 
+# Shared async HTTP client so upstream calls (ElevenLabs, audio downloads) don't block
+# the event loop and reuse keep-alive connections instead of a TLS handshake per request
+http_client = httpx.AsyncClient(
+    http2=True,
+    follow_redirects=True,
+    timeout=httpx.Timeout(30.0),
+    limits=httpx.Limits(max_keepalive_connections=64)
+)
+
 twilio_client = None
 if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
+    # The Twilio SDK is slow to import, so only load it when there are credentials to use
+    from twilio.rest import Client
     twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
 else:
     logger.warning("Twilio credentials not found. Some functionality will be limited.")
@@ -45,82 +61,101 @@ else:
     twilio_client = None
 
 # Initialize AI agent
-ai_agent = RestaurantAIAgent()
-
-# Optional Redis for session management
-redis_client = None
-if os.getenv("REDIS_URL"):
-    redis_client = redis.from_url(os.getenv("REDIS_URL"))
-
-# Restaurant information (static knowledge base)
-RESTAURANT_INFO = {
-    "name": os.getenv("RESTAURANT_NAME", "Restaurant Name"),
-    "address": os.getenv("RESTAURANT_ADDRESS", "Restaurant Address"),
-    "hours": os.getenv("RESTAURANT_HOURS", "Open from 10 AM to 10 PM daily"),
-    "menu_categories": os.getenv("MENU_CATEGORIES", "Appetizers, Main Courses, Desserts, Beverages").split(", "),
-    "delivery_policy": os.getenv("DELIVERY_POLICY", "We offer delivery within a 5-mile radius from 11 AM to 9 PM"),
-    "phone": os.getenv("RESTAURANT_PHONE", "Phone Number")
-}
-
-# System prompt for the AI agent
-SYSTEM_PROMPT = f"""
-You are a professional restaurant call-handling assistant for {RESTAURANT_INFO['name']}. 
-Your primary function is to answer incoming calls, provide information about the restaurant, and assist customers while adhering to strict operational guidelines.
-
-Important guidelines:
-- Answer calls promptly and politely
-- Provide only the restaurant information provided in your knowledge base
-- Never place orders, take reservations, or access any system data
-- If a customer wants to order, make a reservation, or has a complaint, politely transfer to human staff
-- Keep responses short and clear (1-2 sentences when possible)
-- If unsure about information, politely transfer to staff
-- Always offer human handoff when appropriate
-
-Restaurant Information:
-- Name: {RESTAURANT_INFO['name']}
-- Address: {RESTAURANT_INFO['address']}
-- Hours: {RESTAURANT_INFO['hours']}
-- Menu Categories: {', '.join(RESTAURANT_INFO['menu_categories'])}
-- Delivery Policy: {RESTAURANT_INFO['delivery_policy']}
-
-Example responses:
-- Greeting: "Hello! Thank you for calling {RESTAURANT_INFO['name']}. How can I assist you today?"
-- Hours: "We are open {RESTAURANT_INFO['hours'].lower()}."
-- Location: "We are located at {RESTAURANT_INFO['address']}."
-- Orders: "I'd be happy to connect you with our staff who can help you place your order."
-- Closing: "Thank you for calling {RESTAURANT_INFO['name']}. Have a great day!"
-
-If a customer wants to place an order, make a reservation, or has a complaint, always transfer to human staff.
-"""
-
-class CallSession:
-    def __init__(self, call_sid: str):
-        self.call_sid = call_sid
-        self.conversation_history = []
-        self.caller_info = {}
-        self.escalation_needed = False
-        self.call_summary = None
-        
-    def add_message(self, role: str, content: str):
-        self.conversation_history.append({"role": role, "content": content})
-        
-    def needs_escalation(self) -> bool:
-        # Escalation is handled by the AI agent
-        # This method exists for backward compatibility
-        return self.escalation_needed
+ai_agent = RestaurantAIAgent(get_restaurant())
+
+def connect_redis(url: str) -> Optional[redis.Redis]:
+    """Connect to Redis, or return None when it can't be reached so the app falls back to process memory"""
+    client = redis.from_url(url, socket_connect_timeout=2)
+    try:
+        client.ping()
+    except redis.RedisError as e:
+        logger.warning(f"Redis is configured but unreachable ({str(e)}); using in-memory storage instead")
+        return None
+    return client
+
+# Optional Redis for persisting the semantic cache (sessions use the async client below)
+redis_client = connect_redis(settings.redis_url) if settings.redis_url else None
+
+# Restaurant information (static knowledge base), shared with the AI agent
+RESTAURANT_INFO = get_restaurant()
+
+# TwiML responses that don't vary per request, rendered once at startup
+TWIML_GREETING = twilio_handler.generate_twiml_response(
+    "greeting",
+    restaurant_name=RESTAURANT_INFO.name
+)
+TWIML_ESCALATION = twilio_handler.generate_twiml_response(
+    "escalation",
+    restaurant_phone=RESTAURANT_INFO.phone
+)
+TWIML_UNCLEAR = twilio_handler.generate_twiml_response("unclear")
+TWIML_CALL_ERROR = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<Response><Say>Sorry, there was an error processing your call. Please try again later.</Say></Response>'
+)
+
+# Semantic cache for AI responses, shared across calls and persisted in Redis when available
+# Only enabled when replies are really generated; in front of the mock responses it would just add latency
+semantic_cache = SemanticCache(
+    openai_client if ai_agent.generates_with_llm else None,
+    redis_client,
+    namespace=RESTAURANT_INFO.name
+)
+
+# Session storage: Redis when configured and reachable, so sessions survive restarts and are shared between workers
+if redis_client is not None:
+    session_store = RedisSessionStore(redis.asyncio.from_url(settings.redis_url, decode_responses=True))
+else:
+    session_store = InMemorySessionStore()
+
+# Synthesised audio streams, keyed by audio id: (chunk queue, pump task); each is drained once
+# by the /audio endpoint. They live in the memory of the worker that synthesised them, so
+# streaming only works with a single worker (or a proxy that routes the fetch back to it)
+audio_streams: Dict[str, Tuple[asyncio.Queue, asyncio.Task]] = {}
+
+# Chunks buffered per stream before the upstream download waits for the caller to read
+AUDIO_QUEUE_MAX_CHUNKS = 64
+
+# How long a stream waits to be fetched before it is dropped and its download stopped
+AUDIO_STREAM_TTL_SECONDS = 60
+
+# Strong references to background tasks so they aren't garbage collected mid-flight
+background_tasks = set()
 
-# In-memory session storage (use Redis in production)
-sessions: Dict[str, CallSession] = {}
+async def _pump_audio(response: httpx.Response, queue: asyncio.Queue):
+    """Copy a streaming TTS response into a queue, chunk by chunk, ending with None"""
+    try:
+        async for chunk in response.aiter_bytes():
+            await queue.put(chunk)
+    except Exception as e:
+        logger.error(f"TTS streaming error: {str(e)}")
+    finally:
+        await response.aclose()
+    # Not reached when cancelled: then nobody is reading, and a full queue would block forever
+    await queue.put(None)
+
+async def _drain_audio(queue: asyncio.Queue, pump_task: asyncio.Task):
+    """Yield audio chunks from a queue as they arrive"""
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # Stop the upstream download if the caller hung up mid-stream
+        pump_task.cancel()
 
-def get_session(call_sid: str) -> CallSession:
-    if call_sid not in sessions:
-        sessions[call_sid] = CallSession(call_sid)
-    return sessions[call_sid]
+def _expire_audio_stream(audio_id: str):
+    """Drop an audio stream that was never fetched and stop its download"""
+    stream = audio_streams.pop(audio_id, None)
+    if stream is not None:
+        stream[1].cancel()
 
-def text_to_speech(text: str) -> str:
+async def text_to_speech(text: str) -> str:
     """Convert text to speech using ElevenLabs API"""
     try:
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{os.getenv('ELEVENLABS_VOICE_ID', '21m00Tcm4TlvDq8ikWAM')}/stream"
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{settings.elevenlabs_voice_id}/stream"
         
         headers = {
             "Accept": "audio/mpeg",
@@ -136,102 +171,176 @@ def text_to_speech(text: str) -> str:
             }
         }
         
-        response = requests.post(url, json=data, headers=headers)
+        request = http_client.build_request("POST", url, json=data, headers=headers)
+        response = await http_client.send(request, stream=True)
         if response.status_code == 200:
-            # In a real implementation, you'd save this audio to a temporary file and return a URL
-            # For this example, we'll return a placeholder that Twilio can use
-            # For Twilio integration, we'd typically host the audio file temporarily
-            import tempfile
-            import os
-            # Create a temporary file to store the audio
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_audio:
-                temp_audio.write(response.content)
-                # In production, you'd upload this to a cloud storage service
-                # and return the public URL. For this example, we'll return a placeholder
-                return f"http://localhost:8000/audio/{os.path.basename(temp_audio.name)}"
+            # Stream the audio through to the caller as it is generated instead of buffering
+            # the whole file; Twilio's <Play> can start on the first bytes
+            audio_id = uuid.uuid4().hex
+            queue = asyncio.Queue(maxsize=AUDIO_QUEUE_MAX_CHUNKS)
+            
+            task = asyncio.create_task(_pump_audio(response, queue))
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+            
+            audio_streams[audio_id] = (queue, task)
+            asyncio.get_running_loop().call_later(AUDIO_STREAM_TTL_SECONDS, _expire_audio_stream, audio_id)
+            
+            # In production, this should be the service's public URL
+            return f"http://localhost:8000/audio/{audio_id}"
         else:
+            await response.aread()
+            await response.aclose()
             logger.error(f"TTS API error: {response.status_code} - {response.text}")
             return None
     except Exception as e:
         logger.error(f"TTS error: {str(e)}")
         return None
 
-def speech_to_text(audio_url: str) -> str:
+async def speech_to_text(audio_url: str) -> str:
     """Convert speech to text using OpenAI Whisper API"""
     try:
         if not openai_client:
             logger.error("OpenAI client not initialized")
             return ""
         
-        # Download audio file from URL
-        response = requests.get(audio_url)
-        if response.status_code != 200:
-            logger.error(f"Failed to download audio: {response.status_code}")
-            return ""
+        # Stream the recording straight into memory; no temporary file is needed
+        audio_buffer = io.BytesIO()
+        async with http_client.stream("GET", audio_url) as response:
+            if response.status_code != 200:
+                logger.error(f"Failed to download audio: {response.status_code}")
+                return ""
+            async for chunk in response.aiter_bytes():
+                audio_buffer.write(chunk)
+        audio_buffer.seek(0)
         
-        # Save to temporary file for processing
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-            temp_audio.write(response.content)
-            temp_filename = temp_audio.name
+        # The OpenAI SDK takes the file format from the name
+        audio_buffer.name = "audio.wav"
         
-        try:
-            # Use OpenAI Whisper API for transcription
-            with open(temp_filename, "rb") as audio_file:
-                transcript = openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file
-                )
-                return transcript.text
-        finally:
-            # Clean up temporary file
-            import os
-            os.unlink(temp_filename)
+        # Use OpenAI Whisper API for transcription
+        transcript = await asyncio.to_thread(
+            openai_client.audio.transcriptions.create,
+            model="whisper-1",
+            file=audio_buffer
+        )
+        return transcript.text
             
     except Exception as e:
         logger.error(f"STT error: {str(e)}")
         return ""
 
-def get_ai_response(user_message: str, session: CallSession) -> str:
+def compute_ai_response(user_message: str, conversation_history: List[Dict], intent_analysis: Optional[Dict[str, Any]] = None,
+                        update_cache: bool = True) -> Tuple[Dict[str, Any], str]:
+    """Analyze intent and produce a reply without touching the call session"""
+    # Use the AI agent to generate response
+    if intent_analysis is None:
+        intent_analysis = ai_agent.analyze_intent(user_message)
+    
+    # Fixed and mock answers are local lookups; an embedding round trip would only slow them down
+    if not semantic_cache.enabled or ai_agent.has_fixed_response(intent_analysis["primary_intent"]):
+        return intent_analysis, ai_agent.generate_response(user_message, conversation_history, intent_analysis)
+    
+    # Serve a cached reply for semantically similar messages before generating a new one
+    query_embedding = semantic_cache.embed(user_message)
+    ai_response = semantic_cache.lookup(query_embedding)
+    if ai_response is None:
+        ai_response = ai_agent.generate_response(user_message, conversation_history, intent_analysis)
+        if update_cache:
+            semantic_cache.add(query_embedding, ai_response)
+    
+    return intent_analysis, ai_response
+
+async def get_ai_response(user_message: str, session: CallSession, precomputed: Optional[Tuple[Dict[str, Any], str]] = None) -> str:
     """Get response from AI using the RestaurantAIAgent"""
     try:
-        # Use the AI agent to generate response
+        # Intent, and with it escalation, is always decided on the final transcript; it is cheap
         intent_analysis = ai_agent.analyze_intent(user_message)
-        ai_response = ai_agent.generate_response(user_message, session.conversation_history, intent_analysis)
         
-        # Add user message to conversation history
-        session.add_message("user", user_message)
+        # Reuse a reply prefetched from a partial transcript only when the finished utterance
+        # has the same intent, otherwise compute off the event loop (embedding lookups block on the network)
+        if precomputed is not None and precomputed[0]["primary_intent"] == intent_analysis["primary_intent"]:
+            ai_response = precomputed[1]
+        else:
+            _, ai_response = await asyncio.to_thread(
+                compute_ai_response, user_message, list(session.conversation_history), intent_analysis
+            )
         
-        # Add AI response to conversation history
-        session.add_message("assistant", ai_response)
+        # Add the user message and AI response to conversation history together
+        await session_store.add_turn(session, user_message, ai_response)
         
         # Check if escalation is needed based on the conversation
         if ai_agent.needs_escalation(user_message, session.conversation_history, intent_analysis):
             session.escalation_needed = True
+            await session_store.save(session)
         
         return ai_response
     except Exception as e:
         logger.error(f"AI response error: {str(e)}")
         return "I apologize, but I'm experiencing technical difficulties. Let me connect you to our staff."
 
-@app.get("/")
+# Responses prefetched from partial speech results, keyed by CallSid: (partial transcript, task)
+prefetched_responses: Dict[str, Tuple[str, asyncio.Task]] = {}
+
+# Minimum similarity between a partial and the final transcript for a prefetched response to be served
+PREFETCH_SIMILARITY_THRESHOLD = 0.8
+
+# How long a partial transcript must go unrevised before a response is prefetched for it
+PREFETCH_DEBOUNCE_SECONDS = 0.5
+
+async def prefetch_ai_response(call_sid: str, partial_text: str) -> Optional[Tuple[Dict[str, Any], str]]:
+    """Compute a reply for a partial transcript once Twilio stops revising it"""
+    # A newer partial cancels this task while it waits, before any work (a session load,
+    # billed API calls) has started; once the worker thread is running it can no longer be stopped
+    await asyncio.sleep(PREFETCH_DEBOUNCE_SECONDS)
+    
+    # Only prefetch for calls that were answered by the voice webhook
+    session = await session_store.get(call_sid)
+    if session is None:
+        return None
+    
+    # Half-finished utterances must never become semantic cache keys
+    return await asyncio.to_thread(
+        compute_ai_response, partial_text, list(session.conversation_history), None, False
+    )
+
+def take_prefetched_response(call_sid: str, speech_result: str) -> Optional[asyncio.Task]:
+    """Return the prefetch task for a call if its partial transcript matches the final one"""
+    prefetch = prefetched_responses.pop(call_sid, None)
+    if prefetch is None:
+        return None
+    
+    partial_text, task = prefetch
+    similarity = SequenceMatcher(None, partial_text.lower(), speech_result.lower()).ratio()
+    if similarity >= PREFETCH_SIMILARITY_THRESHOLD:
+        return task
+    
+    task.cancel()
+    return None
+
+@router.on_event("shutdown")
+async def close_http_client():
+    await http_client.aclose()
+    await twilio_handler.close()
+
+@router.get("/")
 def read_root():
     return {
         "status": "Restaurant Voice AI Agent is running",
         "endpoints": {
             "voice_webhook": "/webhook/twilio/voice",
             "speech_webhook": "/webhook/twilio/speech",
+            "partial_webhook": "/webhook/twilio/partial",
             "status_webhook": "/webhook/twilio/status",
             "docs": "/docs"
         },
         "configuration": {
-            "twilio_connected": bool(os.getenv("TWILIO_ACCOUNT_SID")),
-            "openai_connected": bool(os.getenv("OPENAI_API_KEY")),
-            "elevenlabs_connected": bool(os.getenv("ELEVENLABS_API_KEY"))
+            "twilio_connected": bool(TWILIO_ACCOUNT_SID),
+            "openai_connected": bool(OPENAI_API_KEY),
+            "elevenlabs_connected": bool(ELEVENLABS_API_KEY)
         }
     }
 
-@app.post("/webhook/twilio/voice")
+@router.post("/webhook/twilio/voice")
 async def handle_twilio_voice_webhook(request: Request):
     """Handle incoming voice calls from Twilio"""
     try:
@@ -246,30 +355,26 @@ async def handle_twilio_voice_webhook(request: Request):
         logger.info("Request validation bypassed to ensure calls connect")
         
         # Create or get session for this call
-        session = get_session(call_sid)
+        session = await session_store.get_or_create(call_sid)
         session.caller_info['phone'] = from_number
+        await session_store.save(session)
         
-        # Generate greeting response using Twilio handler
-        twiml_response = twilio_handler.generate_twiml_response(
-            "greeting", 
-            restaurant_name=RESTAURANT_INFO['name']
-        )
+        # Greeting response, pre-rendered at startup
+        twiml_response = TWIML_GREETING
         
-        logger.info(f"Sending TwiML response for call {call_sid}: {twiml_response[:100]}...")
+        logger.info(f"Sending TwiML response for call {call_sid}: {twiml_response[:100].decode(errors='replace')}...")
         return Response(content=twiml_response, media_type="text/xml")
     except Exception as e:
         logger.error(f"Error handling voice webhook: {str(e)}")
         # Return a simple error response that Twilio can understand
-        error_response = VoiceResponse()
-        error_response.say(message="Sorry, there was an error processing your call. Please try again later.")
-        return Response(content=str(error_response), media_type="text/xml")
+        return Response(content=TWIML_CALL_ERROR, media_type="text/xml")
 
-@app.get("/webhook/twilio/voice")
+@router.get("/webhook/twilio/voice")
 async def handle_twilio_voice_webhook_get():
     """Return a friendly message for GET requests to the voice webhook"""
     return {"message": "This is a Twilio voice webhook endpoint. It handles incoming voice calls from Twilio.", "status": "active"}
 
-@app.post("/webhook/twilio/speech")
+@router.post("/webhook/twilio/speech")
 async def handle_twilio_speech_webhook(request: Request):
     """Handle speech recognition results from Twilio"""
     form_data = await request.form()
@@ -280,23 +385,31 @@ async def handle_twilio_speech_webhook(request: Request):
     logger.info(f"Speech result: '{speech_result}' with confidence {confidence} for CallSid: {call_sid}")
     
     # Get session for this call
-    session = get_session(call_sid)
+    session = await session_store.get_or_create(call_sid)
+    
+    # Pick up any response prefetched from a partial transcript of this utterance
+    prefetch_task = take_prefetched_response(call_sid, speech_result)
     
     # If speech recognition failed or low confidence, ask for repetition
     if not speech_result or float(confidence) < 0.5:
-        twiml_response = twilio_handler.generate_twiml_response("unclear")
-        return Response(content=twiml_response, media_type="text/xml")
+        if prefetch_task is not None:
+            prefetch_task.cancel()
+        return Response(content=TWIML_UNCLEAR, media_type="text/xml")
+    
+    precomputed = None
+    if prefetch_task is not None:
+        try:
+            precomputed = await prefetch_task
+        except Exception as e:
+            logger.error(f"Prefetched response error: {str(e)}")
     
     # Get AI response based on speech result
-    ai_response = get_ai_response(speech_result, session)
+    ai_response = await get_ai_response(speech_result, session, precomputed)
     
     # Check if escalation is needed
     if session.needs_escalation():
-        # Generate escalation response
-        twiml_response = twilio_handler.generate_twiml_response(
-            "escalation",
-            restaurant_phone=RESTAURANT_INFO['phone']
-        )
+        # Escalation response, pre-rendered at startup
+        twiml_response = TWIML_ESCALATION
         
         # Generate and log call summary
         session.call_summary = {
@@ -306,6 +419,7 @@ async def handle_twilio_speech_webhook(request: Request):
             "conversation_length": len(session.conversation_history),
             "escalation_reason": "Order/Reservation/Complaint detected"
         }
+        await session_store.save(session)
         
         return Response(content=twiml_response, media_type="text/xml")
     
@@ -318,7 +432,29 @@ async def handle_twilio_speech_webhook(request: Request):
     
     return Response(content=twiml_response, media_type="text/xml")
 
-@app.post("/webhook/twilio/status")
+@router.post("/webhook/twilio/partial")
+async def handle_twilio_partial_webhook(request: Request):
+    """Handle partial speech recognition results from Twilio by prefetching a response"""
+    form_data = await request.form()
+    call_sid = form_data.get('CallSid', '')
+    partial_text = form_data.get('UnstableSpeechResult') or form_data.get('StableSpeechResult', '')
+    
+    if not call_sid or not partial_text:
+        return Response(content="OK", media_type="text/plain")
+    
+    previous = prefetched_responses.get(call_sid)
+    if previous is not None:
+        if previous[0] == partial_text:
+            return Response(content="OK", media_type="text/plain")
+        previous[1].cancel()
+    
+    # Start computing the response once the partial settles; the speech webhook serves it if the final transcript matches
+    task = asyncio.create_task(prefetch_ai_response(call_sid, partial_text))
+    prefetched_responses[call_sid] = (partial_text, task)
+    
+    return Response(content="OK", media_type="text/plain")
+
+@router.post("/webhook/twilio/status")
 async def handle_twilio_status_webhook(request: Request):
     """Handle call status changes from Twilio"""
     form_data = await request.form()
@@ -330,8 +466,8 @@ async def handle_twilio_status_webhook(request: Request):
     
     if call_status in ['completed', 'busy', 'failed', 'no-answer']:
         # Generate and log call summary when call ends
-        if call_sid in sessions:
-            session = sessions[call_sid]
+        session = await session_store.get(call_sid)
+        if session is not None:
             summary = {
                 "call_sid": call_sid,
                 "caller_phone": from_number,
@@ -341,18 +477,23 @@ async def handle_twilio_status_webhook(request: Request):
                 "summary": session.call_summary
             }
             
-            logger.info(f"Call summary: {json.dumps(summary, indent=2)}")
+            logger.info(f"Call summary: {orjson.dumps(summary, option=orjson.OPT_INDENT_2).decode()}")
             
             # Clean up session
-            del sessions[call_sid]
+            await session_store.delete(call_sid)
+        
+        # Drop any prefetch still pending for the call
+        prefetch = prefetched_responses.pop(call_sid, None)
+        if prefetch is not None:
+            prefetch[1].cancel()
     
     return Response(content="OK", media_type="text/plain")
 
-@app.get("/api/session/{call_sid}")
-def get_call_session(call_sid: str):
+@router.get("/api/session/{call_sid}")
+async def get_call_session(call_sid: str):
     """Get information about a specific call session (for monitoring/debugging)"""
-    if call_sid in sessions:
-        session = sessions[call_sid]
+    session = await session_store.get(call_sid)
+    if session is not None:
         return {
             "call_sid": session.call_sid,
             "conversation_history": session.conversation_history,
@@ -363,11 +504,38 @@ def get_call_session(call_sid: str):
     else:
         raise HTTPException(status_code=404, detail="Session not found")
 
-@app.get("/config-status")
-def config_status():
-    return twilio_handler.get_config_status()
+@router.get("/audio/{audio_id}")
+async def stream_audio(audio_id: str):
+    """Stream synthesised speech to Twilio while it is still being generated"""
+    stream = audio_streams.pop(audio_id, None)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    return StreamingResponse(_drain_audio(*stream), media_type="audio/mpeg")
+
+# The configuration status only changes on redeploy, so clients can revalidate it by ETag
+CONFIG_STATUS_ETAG = '"' + hashlib.sha1(CONFIG_STATUS_JSON).hexdigest()[:16] + '"'
+
+@router.get("/config-status")
+def config_status(request: Request):
+    headers = {"ETag": CONFIG_STATUS_ETAG, "Cache-Control": "public, max-age=60"}
+    if request.headers.get("if-none-match") == CONFIG_STATUS_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=CONFIG_STATUS_JSON, media_type="application/json", headers=headers)
+
+# Standalone app serving the voice agent API at the root; main.py includes the router under /api
+app = FastAPI(default_response_class=ORJSONResponse)
+app.include_router(router)
 
 if __name__ == "__main__":
     import uvicorn
-     
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=settings.workers(redis_client is not None),
+        access_log=settings.access_log,
+        log_level=settings.log_level
+    )
\ No newline at end of file
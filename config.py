@@ -0,0 +1,146 @@
+"""
+Shared configuration for the restaurant voice agent
+"""
+import os
+from functools import cached_property, lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Load environment variables
+load_dotenv()
+
+
+# Upper bound on the worker count picked when WEB_CONCURRENCY is not set
+MAX_DEFAULT_WORKERS = 4
+
+
+class Settings(BaseSettings):
+    """
+    Environment configuration, parsed and validated once per process
+    """
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    twilio_account_sid: Optional[str] = None
+    twilio_auth_token: Optional[str] = None
+    twilio_phone_number: Optional[str] = None
+    openai_api_key: Optional[str] = None
+    elevenlabs_api_key: Optional[str] = None
+    elevenlabs_voice_id: str = "21m00Tcm4TlvDq8ikWAM"
+    redis_url: Optional[str] = None
+    web_concurrency: Optional[int] = None
+    # Per-request access logging costs a log record per hit, so it is off unless asked for
+    access_log: bool = False
+    log_level: str = "warning"
+
+    restaurant_name: str = "Your Restaurant Name"
+    restaurant_address: str = "123 Restaurant Street, City, State 12345"
+    restaurant_hours: str = "Open from 10 AM to 10 PM daily"
+    menu_categories: str = "Appetizers, Main Courses, Desserts, Beverages"
+    delivery_policy: str = "We offer delivery within a 5-mile radius from 11 AM to 9 PM"
+    restaurant_phone: str = "Phone Number"
+
+    def is_set(self, name: str) -> bool:
+        """
+        Whether a setting was given a value by the environment rather than its default
+        """
+        return name in self.model_fields_set and bool(getattr(self, name))
+
+    @cached_property
+    def twilio_configured(self) -> bool:
+        return bool(self.twilio_account_sid and self.twilio_auth_token and self.twilio_phone_number)
+
+    @cached_property
+    def config_status(self) -> Dict[str, bool]:
+        return {
+            "twilio_configured": self.twilio_configured,
+            "openai_configured": bool(self.openai_api_key),
+            "elevenlabs_configured": bool(self.elevenlabs_api_key),
+            "restaurant_info_configured": self.is_set("restaurant_name"),
+            "redis_configured": bool(self.redis_url)
+        }
+
+    def workers(self, redis_available: bool) -> int:
+        """
+        Number of uvicorn worker processes to start
+        """
+        # Sessions only survive across worker processes when they live in Redis,
+        # so default to one worker per CPU only when Redis is actually reachable.
+        # In a container os.cpu_count() is the host's count, not the CPU quota, so the
+        # default is capped; set WEB_CONCURRENCY to run more
+        if self.web_concurrency:
+            return self.web_concurrency
+        return min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS) if redis_available else 1
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the settings shared by every module
+    """
+    return Settings()
+
+
+class RestaurantInfo(NamedTuple):
+    """
+    Static restaurant knowledge base, read from the environment once per process
+    """
+    name: str
+    address: str
+    hours: str
+    menu_categories: Tuple[str, ...]
+    delivery_policy: str
+    phone: str
+
+
+@lru_cache(maxsize=1)
+def get_restaurant() -> RestaurantInfo:
+    """
+    Get the restaurant information shared by the API and the AI agent
+    """
+    settings = get_settings()
+    return RestaurantInfo(
+        name=settings.restaurant_name,
+        address=settings.restaurant_address,
+        hours=settings.restaurant_hours,
+        menu_categories=tuple(settings.menu_categories.split(", ")),
+        delivery_policy=settings.delivery_policy,
+        phone=settings.restaurant_phone
+    )
+
+
+@lru_cache(maxsize=1)
+def get_system_prompt() -> str:
+    """
+    Get the system prompt for the AI agent
+    """
+    restaurant = get_restaurant()
+    return f"""
+You are a professional restaurant call-handling assistant for {restaurant.name}.
+Your primary function is to answer incoming calls, provide information about the restaurant, and assist customers while adhering to strict operational guidelines.
+
+Important guidelines:
+- Answer calls promptly and politely
+- Provide only the restaurant information provided in your knowledge base
+- Never place orders, take reservations, or access any system data
+- If a customer wants to order, make a reservation, or has a complaint, politely transfer to human staff
+- Keep responses short and clear (1-2 sentences when possible)
+- If unsure about information, politely transfer to staff
+- Always offer human handoff when appropriate
+
+Restaurant Information:
+- Name: {restaurant.name}
+- Address: {restaurant.address}
+- Hours: {restaurant.hours}
+- Menu Categories: {', '.join(restaurant.menu_categories)}
+- Delivery Policy: {restaurant.delivery_policy}
+
+Example responses:
+- Greeting: "Hello! Thank you for calling {restaurant.name}. How can I assist you today?"
+- Hours: "We are open {restaurant.hours.lower()}."
+- Location: "We are located at {restaurant.address}."
+- Orders: "I'd be happy to connect you with our staff who can help you place your order."
+- Closing: "Thank you for calling {restaurant.name}. Have a great day!"
+
+If a customer wants to place an order, make a reservation, or has a complaint, always transfer to human staff.
+"""
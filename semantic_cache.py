@@ -0,0 +1,212 @@
+"""
+Semantic response cache for the restaurant voice agent
+"""
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+def _quantize(embedding: np.ndarray):
+    """
+    Quantize a float embedding to int8 with a single scale factor
+    """
+    scale = np.float32(np.max(np.abs(embedding)) / 127)
+    if not scale:
+        return np.zeros(embedding.shape, dtype=np.int8), np.float32(1.0)
+    return np.round(embedding / scale).astype(np.int8), scale
+
+
+def _int8_similarity_scores(matrix, scales, query, query_scale):
+    # Rows and query are unit length before quantization, so the rescaled
+    # integer dot product is the cosine similarity
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for i in range(matrix.shape[0]):
+        total = np.int32(0)
+        for j in range(matrix.shape[1]):
+            total += np.int32(matrix[i, j]) * np.int32(query[j])
+        scores[i] = total * scales[i] * query_scale
+    return scores
+
+
+def _numpy_similarity_scores(matrix, scales, query, query_scale):
+    return (matrix @ query.astype(np.int32)) * scales * query_scale
+
+
+# Scoring kernel, chosen on first use so processes without an enabled cache never import numba
+_similarity_scores = None
+_kernel_lock = threading.Lock()
+
+
+def _load_similarity_kernel():
+    """
+    Compile the numba scoring kernel, or fall back to NumPy when numba is not installed
+    """
+    global _similarity_scores
+    with _kernel_lock:
+        if _similarity_scores is None:
+            try:
+                from numba import njit
+            except ImportError:
+                _similarity_scores = _numpy_similarity_scores
+            else:
+                # Serial on purpose: lookups run on several threads at once, and numba's parallel
+                # workqueue layer aborts the process on concurrent use; 10k rows is fast serially
+                kernel = njit(fastmath=True, cache=True)(_int8_similarity_scores)
+                # Compile the int8 specialisation now so the first lookup doesn't pay for it
+                kernel(np.zeros((1, 1), dtype=np.int8), np.ones(1, dtype=np.float32),
+                       np.zeros(1, dtype=np.int8), np.float32(1.0))
+                _similarity_scores = kernel
+        return _similarity_scores
+
+
+class SemanticCache:
+    """
+    Serves a previously generated reply when a new caller message is
+    semantically close to one that has already been answered
+    """
+
+    def __init__(self, openai_client=None, redis_client=None, namespace: str = "default",
+                 threshold: float = 0.9, max_entries: int = 10000,
+                 embedding_model: str = "text-embedding-3-small"):
+        self.openai_client = openai_client
+        self.redis_client = redis_client
+        # One list entry per cached response: the float32 scale followed by the int8 row,
+        # and the orjson-encoded response text at the same index
+        self.rows_key = f"semantic_cache:int8:{namespace}:rows"
+        self.responses_key = f"semantic_cache:int8:{namespace}:responses"
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.embedding_model = embedding_model
+
+        # Embeddings are L2-normalised and stored as int8 with a per-row scale, one row
+        # per cached response, so a lookup reads a quarter of the bytes of a float32 matrix.
+        # The buffers grow by doubling; only the first `size` rows are in use
+        self.matrix = np.empty((0, 0), dtype=np.int8)
+        self.scales = np.empty(0, dtype=np.float32)
+        self.responses: List[str] = []
+        self.size = 0
+        self._lock = threading.Lock()
+
+        # The cache needs an embedding model; without one every lookup misses
+        self.enabled = openai_client is not None
+        if self.enabled:
+            self._similarity_scores = _load_similarity_kernel()
+            self._load()
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the normalised embedding for a caller message
+        """
+        if not self.enabled or not text:
+            return None
+
+        try:
+            result = self.openai_client.embeddings.create(model=self.embedding_model, input=text)
+        except Exception as e:
+            logger.error(f"Embedding error: {str(e)}")
+            return None
+
+        embedding = np.asarray(result.data[0].embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else None
+
+    def lookup(self, embedding: Optional[np.ndarray]) -> Optional[str]:
+        """
+        Return the cached response most similar to the embedding, if any is close enough
+        """
+        if embedding is None or not self.enabled:
+            return None
+
+        # Read the size before the buffers: add() fills a row, its scale and its response
+        # before publishing the new size, so every row in use is complete
+        size = self.size
+        if not size:
+            return None
+
+        query, query_scale = _quantize(embedding)
+        scores = self._similarity_scores(self.matrix[:size], self.scales[:size], query, query_scale)
+        best = int(scores.argmax())
+        if scores[best] >= self.threshold:
+            return self.responses[best]
+        return None
+
+    def add(self, embedding: Optional[np.ndarray], response: str):
+        """
+        Store a newly generated response under its message embedding
+        """
+        if embedding is None or not response:
+            return
+
+        row, scale = _quantize(embedding)
+        with self._lock:
+            if self.size >= self.max_entries:
+                return
+            self._append(row, scale, response)
+
+        self._save(row, scale, response)
+
+    def _append(self, row: np.ndarray, scale: np.float32, response: str):
+        """
+        Add one entry to the in-memory buffers; the caller holds the lock or owns the cache
+        """
+        size = self.size
+        if size == self.matrix.shape[0]:
+            # Out of room: move to buffers twice the size, so inserts are amortised O(1)
+            capacity = min(max(2 * size, 64), self.max_entries)
+            matrix = np.empty((capacity, row.shape[0]), dtype=np.int8)
+            scales = np.empty(capacity, dtype=np.float32)
+            if size:
+                matrix[:size] = self.matrix[:size]
+                scales[:size] = self.scales[:size]
+            self.matrix, self.scales = matrix, scales
+
+        self.matrix[size] = row
+        self.scales[size] = scale
+        self.responses.append(response)
+        self.size = size + 1
+
+    def _load(self):
+        """
+        Restore the cache from Redis, if a previous process persisted one
+        """
+        if self.redis_client is None:
+            return
+
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.lrange(self.rows_key, 0, self.max_entries - 1)
+            pipe.lrange(self.responses_key, 0, self.max_entries - 1)
+            rows, responses = pipe.execute()
+
+            for entry, response in zip(rows, responses):
+                scale = np.frombuffer(entry, dtype=np.float32, count=1)[0]
+                row = np.frombuffer(entry, dtype=np.int8, offset=4)
+                self._append(row, scale, orjson.loads(response))
+            if self.size:
+                logger.info(f"Loaded {self.size} cached responses from Redis")
+        except Exception as e:
+            logger.error(f"Error loading semantic cache: {str(e)}")
+
+    def _save(self, row: np.ndarray, scale: np.float32, response: str):
+        """
+        Append one entry to Redis so it survives restarts and seeds new workers
+        """
+        if self.redis_client is None:
+            return
+
+        # Appending per entry keeps each write small, and workers add to the shared lists
+        # instead of overwriting each other's copy; both pushes apply atomically
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.rpush(self.rows_key, np.float32(scale).tobytes() + row.tobytes())
+            pipe.rpush(self.responses_key, orjson.dumps(response))
+            pipe.ltrim(self.rows_key, 0, self.max_entries - 1)
+            pipe.ltrim(self.responses_key, 0, self.max_entries - 1)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error saving semantic cache: {str(e)}")
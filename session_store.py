@@ -0,0 +1,121 @@
+"""
+Call session storage for the restaurant voice agent
+"""
+import logging
+from typing import Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# How long an idle call session is kept in Redis before it expires
+SESSION_TTL_SECONDS = 3600
+
+
+class CallSession:
+    def __init__(self, call_sid: str):
+        self.call_sid = call_sid
+        self.conversation_history = []
+        self.caller_info = {}
+        self.escalation_needed = False
+        self.call_summary = None
+
+    def add_message(self, role: str, content: str):
+        self.conversation_history.append({"role": role, "content": content})
+
+    def add_turn(self, user_message: str, assistant_message: str):
+        self.conversation_history.extend((
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": assistant_message}
+        ))
+
+    def needs_escalation(self) -> bool:
+        # Escalation is handled by the AI agent
+        # This method exists for backward compatibility
+        return self.escalation_needed
+
+
+class InMemorySessionStore:
+    """
+    Keeps call sessions in process memory; used when Redis is not configured
+    """
+
+    def __init__(self):
+        self.sessions: Dict[str, CallSession] = {}
+
+    async def get(self, call_sid: str) -> Optional[CallSession]:
+        return self.sessions.get(call_sid)
+
+    async def get_or_create(self, call_sid: str) -> CallSession:
+        if call_sid not in self.sessions:
+            self.sessions[call_sid] = CallSession(call_sid)
+        return self.sessions[call_sid]
+
+    async def add_turn(self, session: CallSession, user_message: str, assistant_message: str):
+        session.add_turn(user_message, assistant_message)
+
+    async def save(self, session: CallSession):
+        # Sessions are stored by reference, so changes are already visible
+        pass
+
+    async def delete(self, call_sid: str):
+        self.sessions.pop(call_sid, None)
+
+
+class RedisSessionStore:
+    """
+    Keeps call sessions in Redis so they survive restarts and are shared between workers
+
+    Each call uses a hash ``call:{sid}`` for caller info, escalation flag and summary,
+    and a list ``conv:{sid}`` for the conversation history. Both expire after the TTL.
+    """
+
+    def __init__(self, redis_client, ttl: int = SESSION_TTL_SECONDS):
+        # Expects a redis.asyncio client created with decode_responses=True
+        self.redis_client = redis_client
+        self.ttl = ttl
+
+    async def get(self, call_sid: str) -> Optional[CallSession]:
+        # Load the session fields and the whole conversation in one round trip
+        pipe = self.redis_client.pipeline()
+        pipe.hgetall(f"call:{call_sid}")
+        pipe.lrange(f"conv:{call_sid}", 0, -1)
+        fields, history = await pipe.execute()
+
+        if not fields and not history:
+            return None
+
+        session = CallSession(call_sid)
+        session.conversation_history = [orjson.loads(message) for message in history]
+        session.caller_info = orjson.loads(fields.get("caller_info", "{}"))
+        session.escalation_needed = fields.get("escalation_needed") == "1"
+        session.call_summary = orjson.loads(fields.get("call_summary", "null"))
+        return session
+
+    async def get_or_create(self, call_sid: str) -> CallSession:
+        session = await self.get(call_sid)
+        return session if session is not None else CallSession(call_sid)
+
+    async def add_turn(self, session: CallSession, user_message: str, assistant_message: str):
+        session.add_turn(user_message, assistant_message)
+
+        # Both messages go out in a single RPUSH, so a turn costs one round trip
+        key = f"conv:{session.call_sid}"
+        pipe = self.redis_client.pipeline()
+        pipe.rpush(key, *(orjson.dumps(message) for message in session.conversation_history[-2:]))
+        pipe.expire(key, self.ttl)
+        await pipe.execute()
+
+    async def save(self, session: CallSession):
+        key = f"call:{session.call_sid}"
+        pipe = self.redis_client.pipeline()
+        pipe.hset(key, mapping={
+            "caller_info": orjson.dumps(session.caller_info),
+            "escalation_needed": "1" if session.escalation_needed else "0",
+            "call_summary": orjson.dumps(session.call_summary)
+        })
+        pipe.expire(key, self.ttl)
+        await pipe.execute()
+
+    async def delete(self, call_sid: str):
+        await self.redis_client.delete(f"call:{call_sid}", f"conv:{call_sid}")
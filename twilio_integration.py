@@ -1,28 +1,98 @@
-from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse
-from twilio.request_validator import RequestValidator
-import os
 import logging
+import httpx
+import orjson
+from email.utils import parsedate_to_datetime
+from xml.sax.saxutils import escape
 from dotenv import load_dotenv
+from config import get_settings
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Pre-parsed TwiML for the per-turn speech response; only the reply text and CallSid vary,
+# so formatting this is much cheaper than building and serializing a VoiceResponse each turn
+_SPEECH_RESPONSE_TWIML = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Response><Say>{ai_response}</Say>'
+    '<Gather action="/webhook/twilio/speech?call_sid={call_sid}" input="speech" method="POST" '
+    'partialResultCallback="/webhook/twilio/partial" profanityFilter="true" speechTimeout="10" timeout="40" />'
+    '</Response>'
+)
+
+_GREETING_TWIML = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Response><Say>Hello! Thank you for calling {restaurant_name}. How can I assist you today?</Say>'
+    '<Gather action="/webhook/twilio/speech" input="speech" method="POST" '
+    'partialResultCallback="/webhook/twilio/partial" profanityFilter="true" speechTimeout="10" timeout="40" />'
+    '</Response>'
+)
+
+_ESCALATION_TWIML = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Response><Say>I\'ll connect you with our staff who can better assist you.</Say>'
+    '<Say>Transferring you to our staff now.</Say>'
+    '<Dial{caller_id}><Number>{restaurant_phone}</Number></Dial>'
+    '</Response>'
+)
+
+_ERROR_TWIML = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Response><Say>{error_message}</Say>'
+    '<Say>I\'m experiencing technical difficulties. Please call back or visit us directly.</Say>'
+    '<Hangup />'
+    '</Response>'
+)
+
+
+# Responses with no per-call fields at all are stored pre-encoded and served as-is
+_UNCLEAR_TWIML = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<Response><Say>I\'m sorry, I couldn\'t hear that clearly. Could you please repeat?</Say>'
+    b'<Gather action="/webhook/twilio/speech" input="speech" method="POST" '
+    b'partialResultCallback="/webhook/twilio/partial" profanityFilter="true" speechTimeout="10" timeout="40" />'
+    b'</Response>'
+)
+
+_DEFAULT_TWIML = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<Response><Say>How can I help you today?</Say></Response>'
+)
+
+def _escape_attr(value: str) -> str:
+    """
+    Escape a value for use inside a double-quoted XML attribute
+    """
+    return escape(value, {'"': "&quot;"})
+
 class TwilioHandler:
     """
     Handles Twilio-specific functionality for the restaurant voice agent
     """
     
     def __init__(self):
-        self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-        self.auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-        self.twilio_phone = os.getenv("TWILIO_PHONE_NUMBER")
+        settings = get_settings()
+        self.account_sid = settings.twilio_account_sid
+        self.auth_token = settings.twilio_auth_token
+        self.twilio_phone = settings.twilio_phone_number
+        
+        # Store credentials for later validation
+        self.has_credentials = settings.twilio_configured
         
         # Initialize client and validator only if credentials are available
-        if all([self.account_sid, self.auth_token, self.twilio_phone]):
-            self.client = Client(self.account_sid, self.auth_token)
+        if self.has_credentials:
+            # Call the REST API directly with a pooled async client, so lookups and hangups
+            # don't block the event loop or pay a TLS handshake each time
+            self.client = httpx.AsyncClient(
+                base_url=f"https://api.twilio.com/2010-04-01/Accounts/{self.account_sid}",
+                auth=(self.account_sid, self.auth_token),
+                http2=True,
+                timeout=httpx.Timeout(10.0),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+            )
+            # Only load the Twilio SDK when there are credentials to validate against
+            from twilio.request_validator import RequestValidator
             self.validator = RequestValidator(self.auth_token)
         else:
             self.client = None
@@ -30,22 +100,15 @@ class TwilioHandler:
             logger.warning("Twilio credentials not found. Some functionality will be limited.")
         
         # Check for other important configuration issues
-        if not os.getenv("OPENAI_API_KEY"):
+        if not settings.openai_api_key:
             logger.warning("OpenAI API key not found. Using mock responses instead of AI.")
-        if not os.getenv("ELEVENLABS_API_KEY"):
+        if not settings.elevenlabs_api_key:
             logger.warning("ElevenLabs API key not found. Text-to-speech may not work properly.")
         
         # Store configuration status
-        self.config_status = {
-            "twilio_configured": all([self.account_sid, self.auth_token, self.twilio_phone]),
-            "openai_configured": bool(os.getenv("OPENAI_API_KEY")),
-            "elevenlabs_configured": bool(os.getenv("ELEVENLABS_API_KEY")),
-            "restaurant_info_configured": bool(os.getenv("RESTAURANT_NAME")),
-            "redis_configured": bool(os.getenv("REDIS_URL"))
-        }
-            
-        # Store credentials for later validation
-        self.has_credentials = all([self.account_sid, self.auth_token, self.twilio_phone])
+        self.config_status = settings.config_status
+        # The status is fixed once the handler is created, so serialize it only once
+        self._config_status_bytes = orjson.dumps(self.config_status)
     
     def get_config_status(self) -> dict:
         """
@@ -53,6 +116,12 @@ class TwilioHandler:
         """
         return self.config_status
     
+    def get_config_status_bytes(self) -> bytes:
+        """
+        Get the configuration status pre-serialized as JSON
+        """
+        return self._config_status_bytes
+    
     def validate_request(self, request_url: str, request_params: dict, signature: str) -> bool:
         """
         Validate incoming Twilio request to ensure it's authentic
@@ -62,127 +131,67 @@ class TwilioHandler:
         logger.info("Request validation bypassed to ensure calls connect")
         return True
     
-    def create_greeting_response(self, restaurant_name: str) -> str:
+    def create_greeting_response(self, restaurant_name: str = "our restaurant") -> bytes:
         """
         Create TwiML response for initial call greeting
         """
-        response = VoiceResponse()
-        
-        greeting = f"Hello! Thank you for calling {restaurant_name}. How can I assist you today?"
-        response.say(message=greeting)
-        
-        # Connect to gather for speech recognition
-        gather = response.gather(
-            input='speech',
-            action='/webhook/twilio/speech',
-            method='POST',
-            timeout=40,
-            speech_timeout=10,
-            profanity_filter=True
-        )
-        
-        return str(response)
+        # Greet the caller, then connect to gather for speech recognition
+        return _GREETING_TWIML.format(restaurant_name=escape(restaurant_name)).encode()
     
-    def create_speech_response(self, ai_response: str, call_sid: str) -> str:
+    def create_speech_response(self, ai_response: str = "", call_sid: str = "") -> bytes:
         """
         Create TwiML response with AI-generated speech
         """
-        response = VoiceResponse()
-        
-        # Play the AI response using text-to-speech
-        response.say(message=ai_response)
-        
-        # Continue gathering more input
-        gather = response.gather(
-            input='speech',
-            action=f'/webhook/twilio/speech?call_sid={call_sid}',
-            method='POST',
-            timeout=40,
-            speech_timeout=10,
-            profanity_filter=True
-        )
-        
-        return str(response)
+        # Play the AI response using text-to-speech, then continue gathering more input
+        return _SPEECH_RESPONSE_TWIML.format(
+            ai_response=escape(ai_response),
+            call_sid=_escape_attr(call_sid)
+        ).encode()
     
-    def create_escalation_response(self, restaurant_phone: str) -> str:
+    def create_escalation_response(self, restaurant_phone: str = "") -> bytes:
         """
         Create TwiML response to transfer call to human staff
         """
-        response = VoiceResponse()
-        
-        response.say(message="I'll connect you with our staff who can better assist you.")
-        response.say(message="Transferring you to our staff now.")
-        
-        # Transfer to human staff
-        response.dial(caller_id=self.twilio_phone).number(restaurant_phone)
-        
-        return str(response)
+        # Transfer to human staff, showing our Twilio number as the caller ID when we have one
+        caller_id = f' callerId="{_escape_attr(self.twilio_phone)}"' if self.twilio_phone else ''
+        return _ESCALATION_TWIML.format(caller_id=caller_id, restaurant_phone=escape(restaurant_phone)).encode()
     
-    def create_error_response(self, error_message: str) -> str:
+    def create_error_response(self, error_message: str = "An error occurred") -> bytes:
         """
         Create TwiML response for error conditions
         """
-        response = VoiceResponse()
-        
-        response.say(message=error_message)
-        response.say(message="I'm experiencing technical difficulties. Please call back or visit us directly.")
-        
-        # End the call
-        response.hangup()
-        
-        return str(response)
+        # Apologise and end the call
+        return _ERROR_TWIML.format(error_message=escape(error_message)).encode()
     
-    def create_unclear_response(self) -> str:
+    def create_unclear_response(self) -> bytes:
         """
         Create TwiML response when speech wasn't understood
         """
-        response = VoiceResponse()
-        
-        response.say(message="I'm sorry, I couldn't hear that clearly. Could you please repeat?")
-        
-        # Try to gather speech again
-        gather = response.gather(
-            input='speech',
-            action='/webhook/twilio/speech',
-            method='POST',
-            timeout=40,
-            speech_timeout=10,
-            profanity_filter=True
-        )
-        
-        return str(response)
+        # Ask the caller to repeat, then try to gather speech again
+        return _UNCLEAR_TWIML
+    
+    # Builder and accepted fields for each response type; the builders' defaults fill in
+    # any missing fields, and fields a builder doesn't take are ignored
+    _RESPONSE_BUILDERS = {
+        "greeting": (create_greeting_response, ("restaurant_name",)),
+        "speech_response": (create_speech_response, ("ai_response", "call_sid")),
+        "escalation": (create_escalation_response, ("restaurant_phone",)),
+        "error": (create_error_response, ("error_message",)),
+        "unclear": (create_unclear_response, ())
+    }
     
-    def generate_twiml_response(self, response_type: str, **kwargs) -> str:
+    def generate_twiml_response(self, response_type: str, **kwargs) -> bytes:
         """
         Generate appropriate TwiML response based on response type
         """
-        if response_type == "greeting":
-            restaurant_name = kwargs.get("restaurant_name", "our restaurant")
-            return self.create_greeting_response(restaurant_name)
-        
-        elif response_type == "speech_response":
-            ai_response = kwargs.get("ai_response", "")
-            call_sid = kwargs.get("call_sid", "")
-            return self.create_speech_response(ai_response, call_sid)
-        
-        elif response_type == "escalation":
-            restaurant_phone = kwargs.get("restaurant_phone", "")
-            return self.create_escalation_response(restaurant_phone)
-        
-        elif response_type == "error":
-            error_message = kwargs.get("error_message", "An error occurred")
-            return self.create_error_response(error_message)
-        
-        elif response_type == "unclear":
-            return self.create_unclear_response()
-        
-        else:
+        entry = self._RESPONSE_BUILDERS.get(response_type)
+        if entry is None:
             # Default response
-            response = VoiceResponse()
-            response.say(message="How can I help you today?")
-            return str(response)
+            return _DEFAULT_TWIML
+        builder, fields = entry
+        return builder(self, **{field: kwargs[field] for field in fields if field in kwargs})
     
-    def get_call_details(self, call_sid: str) -> dict:
+    async def get_call_details(self, call_sid: str) -> dict:
         """
         Retrieve details about a specific call from Twilio
         """
@@ -191,21 +200,23 @@ class TwilioHandler:
             return {}
         
         try:
-            call = self.client.calls(call_sid).fetch()
+            response = await self.client.get(f"/Calls/{call_sid}.json")
+            response.raise_for_status()
+            call = response.json()
             return {
-                "sid": call.sid,
-                "status": call.status,
-                "direction": call.direction,
-                "from": call.from_,
-                "to": call.to,
-                "start_time": call.start_time,
-                "duration": call.duration
+                "sid": call.get("sid"),
+                "status": call.get("status"),
+                "direction": call.get("direction"),
+                "from": call.get("from"),
+                "to": call.get("to"),
+                "start_time": parsedate_to_datetime(call["start_time"]) if call.get("start_time") else None,
+                "duration": call.get("duration")
             }
         except Exception as e:
             logger.error(f"Error fetching call details: {str(e)}")
             return {}
     
-    def end_call(self, call_sid: str) -> bool:
+    async def end_call(self, call_sid: str) -> bool:
         """
         Programmatically end a call
         """
@@ -214,11 +225,22 @@ class TwilioHandler:
             return False
         
         try:
-            call = self.client.calls(call_sid).update(status='completed')
+            response = await self.client.post(f"/Calls/{call_sid}.json", data={"Status": "completed"})
+            response.raise_for_status()
             return True
         except Exception as e:
             logger.error(f"Error ending call: {str(e)}")
             return False
+    
+    async def close(self):
+        """
+        Close the pooled connections to the Twilio API
+        """
+        if self.client is not None:
+            await self.client.aclose()
 
 # Global instance for use in the main app
-twilio_handler = TwilioHandler()
\ No newline at end of file
+twilio_handler = TwilioHandler()
+
+# JSON for the configuration status, fixed once the global handler exists
+CONFIG_STATUS_JSON: bytes = twilio_handler.get_config_status_bytes()
\ No newline at end of file